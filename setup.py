@@ -1,5 +1,6 @@
 from setuptools import setup, find_packages
 import os
+import sys
 
 # Use a default description if README.md is missing
 long_description = "A Python tool to convert between Terraform and CloudFormation formats."
@@ -7,11 +8,26 @@ if os.path.exists("README.md"):
     with open("README.md", "r", encoding="utf-8") as fh:
         long_description = fh.read()
 
+# Optionally compile the template walkers with mypyc, either with
+# `python setup.py build_ext --use-mypyc` or by setting
+# CLOUD_FORMAT_CONVERTER_USE_MYPYC=1 for pip builds. The pure-Python module
+# is used otherwise.
+ext_modules = []
+use_mypyc = os.environ.get("CLOUD_FORMAT_CONVERTER_USE_MYPYC") == "1"
+if "--use-mypyc" in sys.argv:
+    sys.argv.remove("--use-mypyc")
+    use_mypyc = True
+if use_mypyc:
+    from mypyc.build import mypycify
+
+    ext_modules = mypycify(["src/cloud_format_converter/_walkers.py"])
+
 setup(
     name="cloud-format-converter",
     version="1.0.0",
     packages=find_packages(where="src"),
     package_dir={"": "src"},
+    ext_modules=ext_modules,
     install_requires=[
         "pyyaml>=5.1",
         "python-hcl2>=2.0",
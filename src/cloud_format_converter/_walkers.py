@@ -0,0 +1,116 @@
+"""Template traversal helpers used by CloudFormatConverter
+
+These are plain, fully annotated functions so the module can be compiled
+with mypyc (see setup.py). Source installs use the pure-Python module.
+"""
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Pattern, Tuple
+
+# Matches ${Name} placeholders in Fn::Sub templates
+_SUB_GENERIC_RE = re.compile(r'\$\{([^}]+)\}')
+
+# Value types the walkers descend into or rewrite
+_CONTAINER_TYPES = (dict, list)
+_WALKED_TYPES = (dict, list, str)
+
+
+def convert_cf_value_to_tf(value: Any, functions: Dict[str, Callable[[Any], Any]]) -> Any:
+    """Convert CloudFormation value to Terraform format using intrinsic function handlers"""
+    if type(value) not in _CONTAINER_TYPES:
+        return value
+
+    # Walk with an explicit stack of (parent, key, value) so deeply nested
+    # templates don't pay a Python call frame per container
+    root: List[Any] = [value]
+    stack: List[Tuple[Any, Any, Any]] = [(root, 0, value)]
+    while stack:
+        parent, key, item = stack.pop()
+        item_type = type(item)
+        if item_type is dict:
+            if len(item) == 1:
+                fn_name, params = next(iter(item.items()))
+                fn = functions.get(fn_name)
+                if fn is not None:
+                    parent[key] = fn(params)
+                    continue
+            converted_dict = dict(item)
+            parent[key] = converted_dict
+            stack.extend(
+                (converted_dict, k, v) for k, v in item.items() if type(v) in _CONTAINER_TYPES
+            )
+        elif item_type is list:
+            converted_list = list(item)
+            parent[key] = converted_list
+            stack.extend(
+                (converted_list, i, v) for i, v in enumerate(item) if type(v) in _CONTAINER_TYPES
+            )
+    return root[0]
+
+
+def convert_tf_value_to_cf(value: Any, function_items: Tuple[Tuple[str, Any], ...]) -> Any:
+    """Convert Terraform value to CloudFormation format using (name, handler) pairs"""
+    value_type = type(value)
+    if value_type is str:
+        if "${" not in value:
+            return value
+    elif value_type is not dict and value_type is not list:
+        return value
+
+    root: List[Any] = [value]
+    stack: List[Tuple[Any, Any, Any]] = [(root, 0, value)]
+    while stack:
+        parent, key, item = stack.pop()
+        item_type = type(item)
+        if item_type is str:
+            # Handle string interpolation
+            if "${" not in item:
+                continue
+            for tf_func, cf_func in function_items:
+                if tf_func in item:
+                    parent[key] = cf_func(item)
+                    break
+        elif item_type is dict:
+            converted_dict = dict(item)
+            parent[key] = converted_dict
+            stack.extend(
+                (converted_dict, k, v) for k, v in item.items() if type(v) in _WALKED_TYPES
+            )
+        elif item_type is list:
+            converted_list = list(item)
+            parent[key] = converted_list
+            stack.extend(
+                (converted_list, i, v) for i, v in enumerate(item) if type(v) in _WALKED_TYPES
+            )
+    return root[0]
+
+
+def convert_simple_sub(template: str) -> str:
+    """Convert simple Fn::Sub to Terraform format"""
+    # Replace ${XXX} with ${var.XXX} for parameters
+    return _SUB_GENERIC_RE.sub(r'${var.\1}', template)
+
+
+@lru_cache(maxsize=256)
+def _placeholder_pattern(keys: Tuple[str, ...]) -> Pattern[str]:
+    """Compile a pattern matching ${key} for any of the given keys"""
+    return re.compile(r"\$\{(" + "|".join(re.escape(key) for key in keys) + r")\}")
+
+
+def convert_complex_sub(
+    template: str, mapping: Dict[str, Any], convert_value: Callable[[Any], Any]
+) -> str:
+    """Convert complex Fn::Sub to Terraform format"""
+    if not mapping:
+        return template
+
+    resolved: Dict[str, str] = {}
+    for key, value in mapping.items():
+        if isinstance(value, dict):
+            # Handle intrinsic functions in mapping
+            value = convert_value(value)
+        resolved[key] = str(value)
+
+    # Substitute every mapped placeholder in a single pass over the template
+    pattern = _placeholder_pattern(tuple(mapping))
+    return pattern.sub(lambda match: resolved[match.group(1)], template)
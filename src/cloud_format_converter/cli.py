@@ -1,17 +1,61 @@
 #!/usr/bin/env python3
 
 import argparse
+import os
 import sys
-import json
-import yaml
 from pathlib import Path
-from typing import Optional, Union
-from cloud_format_converter.converter import CloudFormatConverter
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Union
+
+try:
+    import orjson
+
+    def _dumps(obj: dict) -> bytes:
+        """Serialize a template as indented JSON"""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+except ImportError:
+    import json
+
+    def _dumps(obj: dict) -> bytes:
+        """Serialize a template as indented JSON"""
+        # Freshly built templates can't be circular, so skip the check
+        return json.dumps(
+            obj, indent=2, ensure_ascii=False, check_circular=False
+        ).encode("utf-8")
+
+if TYPE_CHECKING:
+    from cloud_format_converter.converter import CloudFormatConverter
+
+# Options each subcommand accepts on the fast argv path, with their allowed values
+_FAST_OPTIONS = {
+    "convert": {"--format": ("tf", "cf"), "--output-format": ("json", "yaml")},
+    "validate": {"--type": ("terraform", "cloudformation")},
+}
+_FAST_POSITIONALS = {"convert": ("input", "output"), "validate": ("input",)}
+_FAST_REQUIRED = {"convert": (), "validate": ("type",)}
+
+# Buffer size for output files, so chunked output reaches the OS in few writes
+_WRITE_BUFFER_SIZE = 1 << 20
+
+# Output larger than this is written straight to the stdout file descriptor
+_DIRECT_WRITE_THRESHOLD = 64 * 1024
 
 
 class CloudFormatCLI:
+    __slots__ = ("converter",)
+
     def __init__(self):
-        self.converter = CloudFormatConverter()
+        # Created on first use so `--help` and argument errors don't pay for
+        # importing the HCL/YAML parsers
+        self.converter: Optional["CloudFormatConverter"] = None
+
+    def _get_converter(self) -> "CloudFormatConverter":
+        """Return the converter, importing and creating it on first use"""
+        if self.converter is None:
+            from cloud_format_converter.converter import CloudFormatConverter
+
+            self.converter = CloudFormatConverter()
+        return self.converter
 
     def setup_parser(self) -> argparse.ArgumentParser:
         """Set up command line argument parser"""
@@ -66,6 +110,47 @@ Examples:
 
         return parser
 
+    def _fast_parse(self, argv: List[str]) -> Optional[argparse.Namespace]:
+        """Parse well-formed arguments without building the argparse tree
+
+        Returns None for help, unknown or abbreviated options, invalid values
+        and anything else unusual, so argparse can handle it and report errors.
+        """
+        if not argv or argv[0] not in _FAST_OPTIONS:
+            return None
+
+        command = argv[0]
+        options = _FAST_OPTIONS[command]
+        values: Dict[str, Optional[str]] = {"command": command}
+        values.update((name[2:].replace("-", "_"), None) for name in options)
+        positionals = []
+
+        i = 1
+        while i < len(argv):
+            arg = argv[i]
+            if arg.startswith("-") and arg != "-":
+                name, sep, value = arg.partition("=")
+                if name not in options:
+                    return None
+                if not sep:
+                    i += 1
+                    if i == len(argv):
+                        return None
+                    value = argv[i]
+                if value not in options[name]:
+                    return None
+                values[name[2:].replace("-", "_")] = value
+            else:
+                positionals.append(arg)
+            i += 1
+
+        if len(positionals) != len(_FAST_POSITIONALS[command]):
+            return None
+        values.update(zip(_FAST_POSITIONALS[command], positionals))
+        if any(values[dest] is None for dest in _FAST_REQUIRED[command]):
+            return None
+        return argparse.Namespace(**values)
+
     def read_input(self, input_path: str) -> str:
         """Read input from file or stdin"""
         if input_path == "-":
@@ -75,23 +160,96 @@ Examples:
                 return f.read()
 
     def write_output(
-        self, output_path: str, content: Union[str, dict], output_format: Optional[str] = None
+        self,
+        output_path: str,
+        content: Union[str, dict, Iterable[str]],
+        output_format: Optional[str] = None,
     ) -> None:
-        """Write output to file or stdout"""
+        """Write output to file or stdout
+
+        Content is a rendered string, a CloudFormation template dict or an
+        iterable of string chunks, which are written as they are produced.
+        """
+        output_content: Union[str, bytes]
+        if not isinstance(content, (str, dict)):
+            self._write_chunks(output_path, content)
+            return
+
         if isinstance(content, dict):
             if output_format == "json":
-                output_content = json.dumps(content, indent=2)
+                output_content = _dumps(content)
             else:  # yaml
-                output_content = yaml.dump(content, default_flow_style=False)
+                output_content = self._get_converter().render_yaml(content)
         else:
             output_content = content
 
+        if isinstance(output_content, str):
+            output_content = output_content.encode("utf-8")
+
         if output_path == "-":
-            print(output_content)
+            self._write_stdout(output_content + b"\n")
         else:
-            with open(output_path, "w") as f:
+            with open(output_path, "wb", buffering=_WRITE_BUFFER_SIZE) as f:
                 f.write(output_content)
 
+    def _write_chunks(self, output_path: str, chunks: Iterable[str]) -> None:
+        """Write string chunks to file or stdout without joining them first"""
+        if output_path == "-":
+            try:
+                fd: Optional[int] = sys.stdout.fileno()
+            except (AttributeError, ValueError, OSError):
+                # Replaced or captured stdout without a real descriptor
+                fd = None
+            # Keep ordering with anything already written through sys.stdout
+            sys.stdout.flush()
+            if fd is not None:
+                with open(fd, "wb", buffering=_WRITE_BUFFER_SIZE, closefd=False) as f:
+                    for chunk in chunks:
+                        f.write(chunk.encode("utf-8"))
+                    f.write(b"\n")
+                return
+            buffer = getattr(sys.stdout, "buffer", None)
+            if buffer is not None:
+                for chunk in chunks:
+                    buffer.write(chunk.encode("utf-8"))
+                buffer.write(b"\n")
+                buffer.flush()
+            else:
+                for chunk in chunks:
+                    sys.stdout.write(chunk)
+                sys.stdout.write("\n")
+                sys.stdout.flush()
+        else:
+            with open(output_path, "wb", buffering=_WRITE_BUFFER_SIZE) as f:
+                for chunk in chunks:
+                    f.write(chunk.encode("utf-8"))
+
+    def _write_stdout(self, data: bytes) -> None:
+        """Write data to stdout in as few system calls as possible"""
+        if len(data) > _DIRECT_WRITE_THRESHOLD:
+            try:
+                fd = sys.stdout.fileno()
+            except (AttributeError, ValueError, OSError):
+                # Replaced or captured stdout without a real descriptor
+                fd = None
+            if fd is not None:
+                # Bypass the text layer, flushing it first to keep ordering
+                sys.stdout.flush()
+                remaining = memoryview(data)
+                while remaining:
+                    written = os.write(fd, remaining)
+                    remaining = remaining[written:]
+                return
+
+        buffer = getattr(sys.stdout, "buffer", None)
+        if buffer is not None:
+            sys.stdout.flush()
+            buffer.write(data)
+            buffer.flush()
+        else:
+            sys.stdout.write(data.decode("utf-8"))
+            sys.stdout.flush()
+
     def detect_format(self, file_path: str) -> str:
         """Detect format from file extension"""
         if file_path == "-":
@@ -107,9 +265,6 @@ Examples:
 
     def convert(self, args: argparse.Namespace) -> None:
         """Handle convert command"""
-        # Read input
-        input_content = self.read_input(args.input)
-
         # Determine target format
         target_format = args.format
         if not target_format:
@@ -120,13 +275,24 @@ Examples:
                 sys.exit(1)
 
         try:
-            # Convert content
+            converter = self._get_converter()
+
+            # Convert content, handing files to the converter so Terraform can
+            # reuse cached parse results and CloudFormation YAML is streamed
             if target_format == "cf":
-                result = self.converter.tf_to_cf(input_content)
+                if args.input == "-":
+                    result = converter.tf_to_cf(self.read_input(args.input))
+                else:
+                    result = converter.tf_to_cf_file(args.input)
                 self.write_output(args.output, result, args.output_format)
             else:  # tf
-                result = self.converter.cf_to_tf(input_content)
-                self.write_output(args.output, result)
+                # Terraform output is written block by block as it is rendered
+                if args.input == "-":
+                    tf_chunks = converter.cf_to_tf_chunks(self.read_input(args.input))
+                else:
+                    with open(args.input, "r") as f:
+                        tf_chunks = converter.cf_to_tf_chunks(f)
+                self.write_output(args.output, tf_chunks)
 
         except Exception as e:
             print(f"Error during conversion: {e}", file=sys.stderr)
@@ -136,10 +302,11 @@ Examples:
         """Handle validate command"""
         try:
             input_content = self.read_input(args.input)
+            converter = self._get_converter()
             if args.type == "terraform":
-                self.converter.validate_conversion(input_content, "terraform")
+                converter.validate_conversion(input_content, "terraform")
             else:  # cloudformation
-                self.converter.validate_conversion(input_content, "cloudformation")
+                converter.validate_conversion(input_content, "cloudformation")
             print("Validation successful!")
         except Exception as e:
             print(f"Validation failed: {e}", file=sys.stderr)
@@ -147,16 +314,19 @@ Examples:
 
     def run(self) -> None:
         """Run the CLI application"""
-        parser = self.setup_parser()
-        args = parser.parse_args()
+        args = self._fast_parse(sys.argv[1:])
+        if args is None:
+            # Help, errors and unusual arguments go through the full parser
+            parser = self.setup_parser()
+            args = parser.parse_args()
+            if args.command not in ("convert", "validate"):
+                parser.print_help()
+                sys.exit(1)
 
         if args.command == "convert":
             self.convert(args)
-        elif args.command == "validate":
-            self.validate(args)
         else:
-            parser.print_help()
-            sys.exit(1)
+            self.validate(args)
 
 
 if __name__ == "__main__":
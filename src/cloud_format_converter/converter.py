@@ -1,87 +1,848 @@
+import hashlib
 import json
-import hcl2
-import yaml
-from typing import Dict, Any, Union, List, Optional
+import math
+import mmap
+import os
+import pickle
+import tempfile
+from collections import OrderedDict, defaultdict
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import (
+    IO, Any, Callable, DefaultDict, Dict, Iterator, List, Mapping, Optional, Tuple, Union
+)
 import re
 
+from cloud_format_converter import __version__
+from cloud_format_converter._walkers import (
+    convert_cf_value_to_tf,
+    convert_complex_sub,
+    convert_simple_sub,
+    convert_tf_value_to_cf,
+)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+# Patterns used when translating interpolated expressions
+_SUB_VAR_RE = re.compile(r'\$\{var\.([^}]+)\}')
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _dumps_str_list(items: Any) -> str:
+    """Render a list as JSON, building simple string lists by hand"""
+    if type(items) is not list:
+        return json.dumps(items)
+    for item in items:
+        # Anything json.dumps would escape beyond quotes and backslashes
+        if type(item) is not str or not (item.isascii() and item.isprintable()):
+            return json.dumps(items)
+    return "[" + ", ".join(
+        '"' + item.replace("\\", "\\\\").replace('"', '\\"') + '"' for item in items
+    ) + "]"
+
+
+def _parse_tf_join(expr: str) -> Optional[Tuple[str, List[Any]]]:
+    """Split a Terraform join("delimiter", [...]) call into delimiter and items
+
+    Returns None unless expr is exactly one join call whose items are JSON
+    literals; calls over references such as var.x are left to Terraform.
+    """
+    if not expr.startswith('join("'):
+        return None
+    end_delim = expr.find('"', 6)
+    if end_delim < 6 or expr[end_delim + 1:end_delim + 2] != ",":
+        return None
+    delimiter = expr[6:end_delim]
+
+    start = end_delim + 2
+    while expr[start:start + 1].isspace():
+        start += 1
+    if expr[start:start + 1] != "[":
+        return None
+
+    # The decoder scans to the matching bracket and parses the list in one pass
+    try:
+        items, end = _JSON_DECODER.raw_decode(expr, start)
+    except ValueError:
+        return None
+    if expr[end:] != ")":
+        return None
+    return delimiter, items
+
+
+# Terraform variable types to CloudFormation parameter types
+_CF_PARAM_TYPE_MAP = {
+    "string": "String",
+    "number": "Number",
+    "bool": "String",
+    "list": "CommaDelimitedList",
+    # Complex types
+    "map": "String",
+    "object": "String",
+    "set": "CommaDelimitedList"
+}
+
+# CloudFormation parameter types to Terraform variable types
+_TF_VAR_TYPE_MAP = {
+    "String": "string",
+    "Number": "number",
+    "CommaDelimitedList": "list(string)",
+    "List<Number>": "list(number)",
+    "AWS::EC2::KeyPair::KeyName": "string",
+    "AWS::EC2::SecurityGroup::Id": "string",
+    "AWS::EC2::Subnet::Id": "string",
+    "AWS::EC2::VPC::Id": "string"
+}
+
+
+def _yaml_loader() -> Any:
+    """Return the libyaml-backed safe loader, or the pure-Python one if unavailable"""
+    import yaml
+
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+# Short-form CloudFormation intrinsic function tags and their long-form keys
+_CF_SHORT_FORM_TAGS = {
+    "!Ref": "Ref",
+    "!Condition": "Condition",
+    "!GetAtt": "Fn::GetAtt",
+    "!Sub": "Fn::Sub",
+    "!Join": "Fn::Join",
+    "!Select": "Fn::Select",
+    "!Split": "Fn::Split",
+    "!Base64": "Fn::Base64",
+    "!Cidr": "Fn::Cidr",
+    "!GetAZs": "Fn::GetAZs",
+    "!Equals": "Fn::Equals",
+    "!If": "Fn::If",
+    "!Not": "Fn::Not",
+    "!And": "Fn::And",
+    "!Or": "Fn::Or",
+    "!FindInMap": "Fn::FindInMap",
+    "!ImportValue": "Fn::ImportValue"
+}
+
+
+@lru_cache(maxsize=None)
+def _cf_yaml_loader() -> Any:
+    """Return a YAML loader that expands CloudFormation short-form tags to long form"""
+    import yaml
+
+    class _CFLoader(_yaml_loader()):  # type: ignore[misc]
+        pass
+
+    def make_constructor(fn_name: str) -> Any:
+        def construct(loader: Any, node: Any) -> Dict[str, Any]:
+            if isinstance(node, yaml.ScalarNode):
+                value = loader.construct_scalar(node)
+                if fn_name == "Fn::GetAtt":
+                    # !GetAtt Resource.Attribute is the list form in long notation
+                    value = value.split(".", 1)
+            elif isinstance(node, yaml.SequenceNode):
+                value = loader.construct_sequence(node, deep=True)
+            else:
+                value = loader.construct_mapping(node, deep=True)
+            return {fn_name: value}
+
+        return construct
+
+    for tag, fn_name in _CF_SHORT_FORM_TAGS.items():
+        _CFLoader.add_constructor(tag, make_constructor(fn_name))
+    return _CFLoader
+
+
+# Maximum number of parsed templates kept in the on-disk cache
+_PARSE_CACHE_MAX_ENTRIES = 200
+
+# In-process memo of pickled parse results by cache key, for templates up to
+# _PARSE_MEMO_MAX_CONTENT characters or bytes
+_PARSE_MEMO: "OrderedDict[str, bytes]" = OrderedDict()
+_PARSE_MEMO_MAX_ENTRIES = 128
+_PARSE_MEMO_MAX_CONTENT = 1 << 20
+
+# Distributions whose output the parse cache stores, by content kind
+_PARSER_DISTRIBUTIONS = {"tf": "python-hcl2", "cf": "PyYAML"}
+
+
+@lru_cache(maxsize=None)
+def _parse_cache_salt(kind: str) -> bytes:
+    """Return the versions a cached parse result of kind depends on
+
+    Entries are keyed by these as well as the content, so upgrading this
+    package or its parser never reuses results in an older output shape.
+    """
+    try:
+        from importlib.metadata import version
+
+        parser_version = version(_PARSER_DISTRIBUTIONS[kind])
+    except Exception:
+        # Python 3.7 has no importlib.metadata; ask the parser itself
+        if kind == "tf":
+            import hcl2
+
+            parser_version = hcl2.__version__
+        else:
+            import yaml
+
+            parser_version = yaml.__version__
+    return f"{__version__}\0{parser_version}\0".encode("utf-8")
+
+
+def _parse_cache_dir() -> Optional[Path]:
+    """Return the directory holding pickled parse results
+
+    Returns None when the on-disk cache is turned off with
+    CLOUD_FORMAT_CONVERTER_NO_CACHE.
+    """
+    if os.environ.get("CLOUD_FORMAT_CONVERTER_NO_CACHE"):
+        return None
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "cloud-format-converter"
+
+
+def _parse(content: str, kind: str) -> Any:
+    """Parse Terraform (kind "tf") or CloudFormation (kind "cf") content"""
+    if kind == "tf":
+        import hcl2
+
+        return hcl2.loads(content)
+    return _parse_cf(content)
+
+
+def _parse_cf(content: str) -> Any:
+    """Parse a CloudFormation template written in JSON or YAML"""
+    # JSON templates always open with an object; anything else is YAML
+    if content.lstrip()[:1] == "{":
+        try:
+            if orjson is not None:
+                return orjson.loads(content)
+            return json.loads(content)
+        except ValueError:
+            # Flow-style YAML such as {Resources: {...}} also starts with a brace
+            pass
+    import yaml
+
+    return yaml.load(content, Loader=_cf_yaml_loader())
+
+
+def _parse_cf_file(cf_file: IO[str]) -> Any:
+    """Parse a CloudFormation template from an open file
+
+    YAML is loaded straight from the file handle instead of being read into
+    a single string first. Handles bypass the parse caches, which are keyed
+    by template text.
+    """
+    if not cf_file.seekable():
+        return _parse_cf(cf_file.read())
+
+    # Peek at the first non-blank character to tell JSON from YAML
+    start = cf_file.tell()
+    first = cf_file.read(1)
+    while first and first.isspace():
+        first = cf_file.read(1)
+    cf_file.seek(start)
+
+    if first == "{":
+        # Neither JSON parser reads incrementally, so JSON is read whole
+        content = cf_file.read()
+        try:
+            if orjson is not None:
+                return orjson.loads(content)
+            return json.loads(content)
+        except ValueError:
+            # Flow-style YAML such as {Resources: {...}} also starts with a brace
+            del content
+            cf_file.seek(start)
+    import yaml
+
+    return yaml.load(cf_file, Loader=_cf_yaml_loader())
+
+
+def _evict_parse_cache(cache_dir: Path) -> None:
+    """Drop the least recently used entries beyond the cache size limit"""
+    entries = list(cache_dir.glob("*.pkl"))
+    if len(entries) <= _PARSE_CACHE_MAX_ENTRIES:
+        return
+    # Hits touch their entry's mtime; atime isn't reliable on relatime/noatime mounts
+    entries.sort(key=os.path.getmtime)
+    for entry in entries[: len(entries) - _PARSE_CACHE_MAX_ENTRIES]:
+        entry.unlink()
+
+
+def _write_parse_cache(cache_file: Path, pickled: bytes) -> None:
+    """Store a pickled parse result, ignoring any failure to write it"""
+    cache_dir = cache_file.parent
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so concurrent runs never read a partial entry
+        fd, tmp_name = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(pickled)
+        os.replace(tmp_name, cache_file)
+    except OSError:
+        # Eviction only looks at *.pkl files, so remove the partial entry here
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        return
+    try:
+        _evict_parse_cache(cache_dir)
+    except OSError:
+        pass
+
+
+def _parse_cached(content: Union[str, bytes, mmap.mmap], kind: str) -> Any:
+    """Parse content, reusing an earlier result for identical content
+
+    Results are pickled under the user cache directory keyed by the SHA-256
+    of the content and the parser versions, so an unchanged file is never
+    parsed twice. Cache failures are ignored and fall back to a plain parse.
+    Content may be UTF-8 encoded bytes or a memory map, which is only
+    decoded on a miss.
+
+    The pickles of small templates are also kept in memory by digest, so
+    repeated calls in one process skip the disk; every caller gets its own
+    unpickled copy to modify.
+    """
+    digest = hashlib.sha256(_parse_cache_salt(kind))
+    digest.update(content.encode("utf-8") if isinstance(content, str) else content)
+    key = f"{kind}-{digest.hexdigest()}"
+
+    pickled = _PARSE_MEMO.get(key)
+    if pickled is not None:
+        _PARSE_MEMO.move_to_end(key)
+        return pickle.loads(pickled)
+
+    cache_dir = _parse_cache_dir()
+    cache_file = cache_dir / f"{key}.pkl" if cache_dir is not None else None
+
+    pickled = None
+    if cache_file is not None:
+        try:
+            with open(cache_file, "rb") as f:
+                pickled = f.read()
+            result = pickle.loads(pickled)
+        except Exception:
+            # Missing, truncated or unreadable entries (e.g. a newer pickle
+            # protocol than this Python supports) are parsed again
+            pickled = None
+        else:
+            # Mark the entry as recently used for eviction
+            try:
+                os.utime(cache_file)
+            except OSError:
+                pass
+
+    if pickled is None:
+        text = content if isinstance(content, str) else str(content, "utf-8")
+        result = _parse(text, kind)
+        pickled = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        if cache_file is not None:
+            _write_parse_cache(cache_file, pickled)
+
+    if len(content) <= _PARSE_MEMO_MAX_CONTENT:
+        _PARSE_MEMO[key] = pickled
+        if len(_PARSE_MEMO) > _PARSE_MEMO_MAX_ENTRIES:
+            _PARSE_MEMO.popitem(last=False)
+
+    return result
+
+
+def _merge_hcl_blocks(blocks: Any, labels: int) -> Dict[str, Any]:
+    """Merge python-hcl2's list of blocks into one dict keyed by block labels
+
+    hcl2 returns each block as its own single-entry dict in a list, e.g.
+    resource blocks as [{type: {name: body}}, ...]; labels is how many label
+    levels to merge (2 for resources, 1 for variables and outputs, 0 for
+    unlabelled nested blocks).
+    """
+    if isinstance(blocks, dict):
+        return blocks
+    merged: Dict[str, Any] = {}
+    for block in blocks:
+        if labels > 1:
+            for label, body in block.items():
+                merged.setdefault(label, {}).update(_merge_hcl_blocks(body, labels - 1))
+        else:
+            merged.update(block)
+    return merged
+
+
+def _parse_hcl(content: str) -> Any:
+    """Parse Terraform HCL, reusing the result for content seen earlier"""
+    return _parse_cached(content, "tf")
+
+
+def _parse_hcl_file(path: Union[str, "os.PathLike[str]"]) -> Any:
+    """Parse a Terraform file, hashing it in place through a memory map"""
+    with open(path, "rb") as f:
+        # Empty files can't be memory-mapped
+        if os.fstat(f.fileno()).st_size == 0:
+            return _parse_cached("", "tf")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm.find(b"\r") != -1:
+                # Translate line endings like a text-mode read would, since
+                # hcl2 rejects carriage returns
+                content = str(mm, "utf-8").replace("\r\n", "\n").replace("\r", "\n")
+                return _parse_cached(content, "tf")
+            return _parse_cached(mm, "tf")
+
+
+def _parse_yaml(content: str) -> Any:
+    """Parse a CloudFormation template, reusing the result for content seen earlier"""
+    return _parse_cached(content, "cf")
+
+
+@lru_cache(maxsize=256)
+def _fallback_cf_type(tf_type: str) -> str:
+    """Derive a CloudFormation type for an unmapped Terraform type"""
+    parts = tf_type.split('_')
+    return f"AWS::{parts[1].title()}::{parts[2].title()}"
+
+
+@lru_cache(maxsize=256)
+def _fallback_tf_type(cf_type: str) -> str:
+    """Derive a Terraform type for an unmapped CloudFormation type"""
+    parts = cf_type.split('::')
+    return f"aws_{parts[1].lower()}_{parts[2].lower()}"
+
+
+# Strings that can be written as plain YAML scalars: starting with a letter or
+# underscore rules out numbers, dates and indicator characters
+_YAML_PLAIN_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_.:/ -]*")
+
+# Plain scalars PyYAML would read back as booleans or null
+_YAML_RESERVED = frozenset({"true", "false", "yes", "no", "on", "off", "null", "y", "n"})
+
+
+class _YamlFallback(Exception):
+    """Raised by the fast YAML emitter for values it leaves to PyYAML"""
+
+
+def _format_yaml_scalar(value: Any) -> str:
+    """Format a scalar for the fast YAML emitter"""
+    if isinstance(value, str):
+        if (
+            _YAML_PLAIN_RE.fullmatch(value)
+            and not value.endswith((":", " "))
+            and ": " not in value
+            and value.lower() not in _YAML_RESERVED
+        ):
+            return value
+        if not value.isascii():
+            raise _YamlFallback(value)
+        # JSON string escapes are valid in double-quoted YAML scalars
+        return json.dumps(value)
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if value is None:
+        return "null"
+    if isinstance(value, int):
+        return repr(value)
+    if isinstance(value, float) and math.isfinite(value):
+        text = repr(value)
+        mantissa, e, exponent = text.partition("e")
+        if e and "." not in mantissa:
+            # YAML 1.1 only resolves floats with a dot, so 1e+20 needs to be 1.0e+20
+            return f"{mantissa}.0e{exponent}"
+        return text
+    raise _YamlFallback(value)
+
+
+def _emit_yaml_lines(value: Any, indent: str, lines: List[str]) -> None:
+    """Append block-style YAML lines for a non-empty dict or list"""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            prefix = f"{indent}{_format_yaml_scalar(key)}:"
+            if isinstance(item, dict) and item:
+                lines.append(prefix)
+                _emit_yaml_lines(item, indent + "  ", lines)
+            elif isinstance(item, list) and item:
+                # Sequences inside mappings are not indented, as PyYAML emits them
+                lines.append(prefix)
+                _emit_yaml_lines(item, indent, lines)
+            else:
+                lines.append(f"{prefix} {_format_yaml_empty_or_scalar(item)}")
+    else:
+        for item in value:
+            if isinstance(item, (dict, list)) and item:
+                # Render the item one level deeper, then put the dash on its first line
+                start = len(lines)
+                _emit_yaml_lines(item, indent + "  ", lines)
+                lines[start] = f"{indent}- {lines[start][len(indent) + 2:]}"
+            else:
+                lines.append(f"{indent}- {_format_yaml_empty_or_scalar(item)}")
+
+
+def _format_yaml_empty_or_scalar(value: Any) -> str:
+    """Format an empty container or scalar for the fast YAML emitter"""
+    if isinstance(value, dict):
+        return "{}"
+    if isinstance(value, list):
+        return "[]"
+    return _format_yaml_scalar(value)
+
+
+def _emit_cf_yaml(template: Dict[str, Any]) -> str:
+    """Render a CloudFormation template as block-style YAML
+
+    Templates are plain dicts, lists and simple scalars, so they are written
+    directly instead of through PyYAML's representer and emitter. Values the
+    emitter doesn't handle, such as non-ASCII strings, fall back to PyYAML.
+    """
+    if not template:
+        return "{}\n"
+    lines: List[str] = []
+    try:
+        _emit_yaml_lines(template, "", lines)
+    except _YamlFallback:
+        import yaml
+
+        dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+        return yaml.dump(template, Dumper=dumper, default_flow_style=False, sort_keys=False)
+    lines.append("")
+    return "\n".join(lines)
+
+
+# Nested blocks, as opposed to map-valued arguments, in generated configuration
+_HCL_NESTED_BLOCKS = frozenset({"required_providers", "assume_role", "validation"})
+
+# Arguments whose values are Terraform expressions rather than strings
+_HCL_RAW_ARGUMENTS = frozenset({"type", "condition"})
+
+# Argument names that can be written without quotes
+_HCL_IDENTIFIER_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_-]*")
+
+
+def _format_hcl_value(value: Any, indent: str) -> str:
+    """Format a value as an HCL expression"""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if value is None:
+        return "null"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, list):
+        return "[" + ", ".join(_format_hcl_value(item, indent) for item in value) + "]"
+    if isinstance(value, dict):
+        if not value:
+            return "{}"
+        inner = indent + "  "
+        lines = [
+            f"{inner}{json.dumps(str(key))} = {_format_hcl_value(item, inner)}"
+            for key, item in value.items()
+        ]
+        return "{\n" + "\n".join(lines) + f"\n{indent}}}"
+    return json.dumps(str(value), ensure_ascii=False)
+
+
+def _format_hcl_body(body: Dict[str, Any], indent: str, resource_body: bool) -> List[str]:
+    """Format the arguments and nested blocks of an HCL block body as lines"""
+    lines = []
+    for key, value in body.items():
+        if not resource_body and key in _HCL_NESTED_BLOCKS and isinstance(value, dict):
+            lines.append(f"{indent}{key} {{")
+            lines.extend(_format_hcl_body(value, indent + "  ", False))
+            lines.append(f"{indent}}}")
+            continue
+
+        if not resource_body and key in _HCL_RAW_ARGUMENTS and isinstance(value, str):
+            formatted = value
+        else:
+            formatted = _format_hcl_value(value, indent)
+
+        # Resource arguments come from arbitrary template properties, so quote
+        # any that aren't valid identifiers
+        name = key if not resource_body or _HCL_IDENTIFIER_RE.fullmatch(key) else json.dumps(key)
+        lines.append(f"{indent}{name} = {formatted}")
+    return lines
+
+
+def _format_hcl_block(header: str, body: Dict[str, Any], resource_body: bool) -> str:
+    """Format a top-level HCL block"""
+    if not body:
+        return f"{header} {{}}\n"
+    lines = [f"{header} {{"]
+    lines.extend(_format_hcl_body(body, "  ", resource_body))
+    lines.append("}\n")
+    return "\n".join(lines)
+
+
+def _tf_reference_name(reference: str) -> str:
+    """Return the resource name of a depends_on entry such as ${aws_s3_bucket.logs}"""
+    if reference.startswith("${") and reference.endswith("}"):
+        reference = reference[2:-1]
+    return reference.rsplit(".", 1)[-1]
+
+
+@lru_cache(maxsize=256)
+def _snake_to_pascal(name: str) -> str:
+    """Convert a Terraform argument name to a CloudFormation property name"""
+    return "".join(part[:1].upper() + part[1:] for part in name.split("_"))
+
+
+def _convert_tf_block_to_cf(
+    config: Dict[str, Any], renames: Optional[Dict[str, str]] = None
+) -> Dict[str, Any]:
+    """Convert a Terraform block's arguments to CloudFormation properties
+
+    Argument names become PascalCase unless renames gives the property name.
+    Nested blocks, which hcl2 returns as lists of dicts, are converted the
+    same way; map values such as environment variables keep their keys.
+    """
+    properties: Dict[str, Any] = {}
+    for key, value in config.items():
+        name = renames.get(key) if renames else None
+        if name is None:
+            name = _snake_to_pascal(key)
+        if key == "tags" and isinstance(value, dict):
+            properties[name] = [{"Key": k, "Value": v} for k, v in value.items()]
+        elif isinstance(value, list) and value and all(isinstance(item, dict) for item in value):
+            blocks = [_convert_tf_block_to_cf(item) for item in value]
+            properties[name] = blocks[0] if len(blocks) == 1 else blocks
+        else:
+            properties[name] = value
+    return properties
+
+
+def _handle_generic(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert arguments of a resource type without a dedicated handler"""
+    return _convert_tf_block_to_cf(config)
+
+
+def _handle_s3(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert aws_s3_bucket arguments to AWS::S3::Bucket properties"""
+    return _convert_tf_block_to_cf(config, {"bucket": "BucketName"})
+
+
+def _handle_lambda(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert aws_lambda_function arguments to AWS::Lambda::Function properties"""
+    # The deployment package location is grouped under Code in CloudFormation
+    code_keys = ("s3_bucket", "s3_key", "s3_object_version")
+    code = {_snake_to_pascal(key): config[key] for key in code_keys if key in config}
+    properties = _convert_tf_block_to_cf(
+        {key: value for key, value in config.items() if key not in code_keys}
+    )
+    if code:
+        properties["Code"] = code
+    return properties
+
+
+def _handle_iam_role(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert aws_iam_role arguments to AWS::IAM::Role properties"""
+    properties = _convert_tf_block_to_cf(
+        config, {"name": "RoleName", "assume_role_policy": "AssumeRolePolicyDocument"}
+    )
+    policy = properties.get("AssumeRolePolicyDocument")
+    if isinstance(policy, str) and policy.lstrip().startswith("{"):
+        # Terraform takes the policy as a JSON string, CloudFormation as an
+        # object; policies hcl2 leaves escaped or interpolated stay strings
+        try:
+            properties["AssumeRolePolicyDocument"] = json.loads(policy)
+        except ValueError:
+            pass
+    return properties
+
+
+# Property converters for Terraform resource types that need more than renaming
+_RESOURCE_HANDLERS = {
+    "aws_s3_bucket": _handle_s3,
+    "aws_lambda_function": _handle_lambda,
+    "aws_iam_role": _handle_iam_role,
+}
+
+
+# CloudFormation properties whose Terraform argument isn't their snake_case name
+_CF_TO_TF_PROP = {
+    "BucketName": "bucket",
+    "RoleName": "name",
+    "AssumeRolePolicyDocument": "assume_role_policy",
+    "TableName": "name",
+    "QueueName": "name",
+    "TopicName": "name",
+}
+
+# CloudFormation properties holding user-defined keys or policy documents,
+# which are kept as written
+_CF_MAP_PROPERTIES = frozenset({"Variables", "AssumeRolePolicyDocument", "PolicyDocument"})
+
+_CAMEL_BOUNDARY_RE = re.compile(r"(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])")
+
+
+@lru_cache(maxsize=256)
+def _camel_to_snake(name: str) -> str:
+    """Convert a CloudFormation property name to a Terraform argument name"""
+    return _CAMEL_BOUNDARY_RE.sub("_", name).lower()
+
+
+def _is_cf_intrinsic(value: Dict[str, Any]) -> bool:
+    """Return whether a dict is an intrinsic function call such as {"Ref": ...}"""
+    if len(value) != 1:
+        return False
+    key = next(iter(value))
+    return key == "Ref" or key.startswith("Fn::")
+
+
+def _convert_cf_block_to_tf(properties: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert CloudFormation properties to Terraform arguments
+
+    Names come from _CF_TO_TF_PROP or are converted to snake_case, and
+    nested property types are converted the same way. Intrinsic function
+    calls are left for the value walker.
+    """
+    arguments: Dict[str, Any] = {}
+    for key, value in properties.items():
+        name = _CF_TO_TF_PROP.get(key)
+        if name is None:
+            name = _camel_to_snake(key)
+        if key == "Tags" and isinstance(value, list):
+            value = {
+                tag["Key"]: tag.get("Value")
+                for tag in value
+                if isinstance(tag, dict) and isinstance(tag.get("Key"), str)
+            }
+        elif isinstance(value, dict):
+            if key not in _CF_MAP_PROPERTIES and not _is_cf_intrinsic(value):
+                value = _convert_cf_block_to_tf(value)
+        elif isinstance(value, list):
+            value = [
+                _convert_cf_block_to_tf(item)
+                if isinstance(item, dict) and not _is_cf_intrinsic(item)
+                else item
+                for item in value
+            ]
+        arguments[name] = value
+    return arguments
+
+
+# CloudFormation resource types and their Terraform equivalents
+_RESOURCE_CF_TO_TF: Mapping[str, str] = MappingProxyType({
+    # Compute
+    "AWS::EC2::Instance": "aws_instance",
+    "AWS::EC2::Volume": "aws_ebs_volume",
+    "AWS::EC2::VPC": "aws_vpc",
+    "AWS::EC2::Subnet": "aws_subnet",
+    "AWS::EC2::SecurityGroup": "aws_security_group",
+    "AWS::EC2::RouteTable": "aws_route_table",
+    "AWS::EC2::NetworkInterface": "aws_network_interface",
+
+    # Storage
+    "AWS::S3::Bucket": "aws_s3_bucket",
+    "AWS::S3::BucketPolicy": "aws_s3_bucket_policy",
+    "AWS::EFS::FileSystem": "aws_efs_file_system",
+
+    # Database
+    "AWS::RDS::DBInstance": "aws_db_instance",
+    "AWS::RDS::DBCluster": "aws_rds_cluster",
+    "AWS::DynamoDB::Table": "aws_dynamodb_table",
+
+    # Networking
+    "AWS::ElasticLoadBalancingV2::LoadBalancer": "aws_lb",
+    "AWS::ElasticLoadBalancingV2::TargetGroup": "aws_lb_target_group",
+    "AWS::ElasticLoadBalancingV2::Listener": "aws_lb_listener",
+
+    # Identity
+    "AWS::IAM::Role": "aws_iam_role",
+    "AWS::IAM::Policy": "aws_iam_policy",
+    "AWS::IAM::User": "aws_iam_user",
+    "AWS::IAM::Group": "aws_iam_group",
+
+    # Serverless
+    "AWS::Lambda::Function": "aws_lambda_function",
+    "AWS::ApiGateway::RestApi": "aws_api_gateway_rest_api",
+    "AWS::ApiGateway::Resource": "aws_api_gateway_resource",
+    "AWS::ApiGateway::Method": "aws_api_gateway_method",
+
+    # Containers
+    "AWS::ECS::Cluster": "aws_ecs_cluster",
+    "AWS::ECS::Service": "aws_ecs_service",
+    "AWS::ECS::TaskDefinition": "aws_ecs_task_definition",
+
+    # Monitoring
+    "AWS::CloudWatch::Alarm": "aws_cloudwatch_metric_alarm",
+    "AWS::CloudWatch::Dashboard": "aws_cloudwatch_dashboard",
+    "AWS::SNS::Topic": "aws_sns_topic"
+})
+
+# Terraform resource types and their CloudFormation equivalents
+_RESOURCE_TF_TO_CF: Mapping[str, str] = MappingProxyType(
+    {v: k for k, v in _RESOURCE_CF_TO_TF.items()}
+)
+
+
 class CloudFormatConverter:
+    __slots__ = (
+        "resource_type_mappings",
+        "reverse_resource_type_mappings",
+        "_cf_to_tf_functions",
+        "_tf_to_cf_functions",
+        "_tf_func_items",
+    )
+
     def __init__(self):
-        # Expanded resource type mappings
-        self.resource_type_mappings = {
-            # Compute
-            "AWS::EC2::Instance": "aws_instance",
-            "AWS::EC2::Volume": "aws_ebs_volume",
-            "AWS::EC2::VPC": "aws_vpc",
-            "AWS::EC2::Subnet": "aws_subnet",
-            "AWS::EC2::SecurityGroup": "aws_security_group",
-            "AWS::EC2::RouteTable": "aws_route_table",
-            "AWS::EC2::NetworkInterface": "aws_network_interface",
-            
-            # Storage
-            "AWS::S3::Bucket": "aws_s3_bucket",
-            "AWS::S3::BucketPolicy": "aws_s3_bucket_policy",
-            "AWS::EFS::FileSystem": "aws_efs_file_system",
-            
-            # Database
-            "AWS::RDS::DBInstance": "aws_db_instance",
-            "AWS::RDS::DBCluster": "aws_rds_cluster",
-            "AWS::DynamoDB::Table": "aws_dynamodb_table",
-            
-            # Networking
-            "AWS::ElasticLoadBalancingV2::LoadBalancer": "aws_lb",
-            "AWS::ElasticLoadBalancingV2::TargetGroup": "aws_lb_target_group",
-            "AWS::ElasticLoadBalancingV2::Listener": "aws_lb_listener",
-            
-            # Identity
-            "AWS::IAM::Role": "aws_iam_role",
-            "AWS::IAM::Policy": "aws_iam_policy",
-            "AWS::IAM::User": "aws_iam_user",
-            "AWS::IAM::Group": "aws_iam_group",
-            
-            # Serverless
-            "AWS::Lambda::Function": "aws_lambda_function",
-            "AWS::ApiGateway::RestApi": "aws_api_gateway_rest_api",
-            "AWS::ApiGateway::Resource": "aws_api_gateway_resource",
-            "AWS::ApiGateway::Method": "aws_api_gateway_method",
-            
-            # Containers
-            "AWS::ECS::Cluster": "aws_ecs_cluster",
-            "AWS::ECS::Service": "aws_ecs_service",
-            "AWS::ECS::TaskDefinition": "aws_ecs_task_definition",
-            
-            # Monitoring
-            "AWS::CloudWatch::Alarm": "aws_cloudwatch_metric_alarm",
-            "AWS::CloudWatch::Dashboard": "aws_cloudwatch_dashboard",
-            "AWS::SNS::Topic": "aws_sns_topic"
-        }
-        
-        # Reverse mappings for terraform to cloudformation
-        self.reverse_resource_type_mappings = {
-            v: k for k, v in self.resource_type_mappings.items()
-        }
-        
-        # Function mappings for intrinsic functions
-        self.cf_to_tf_functions = {
-            "Fn::Join": self._convert_join,
-            "Fn::Sub": self._convert_sub,
-            "Ref": self._convert_ref,
-            "Fn::GetAtt": self._convert_get_att,
-            "Fn::Select": self._convert_select,
-            "Condition": self._convert_condition
-        }
-        
-        self.tf_to_cf_functions = {
-            "join": self._convert_to_cf_join,
-            "format": self._convert_to_cf_sub,
-            "aws_region": {"Ref": "AWS::Region"},
-            "aws_account_id": {"Ref": "AWS::AccountId"}
-        }
+        # Resource type mappings are shared, read-only module tables; assign a
+        # new mapping to customize them for one converter
+        self.resource_type_mappings = _RESOURCE_CF_TO_TF
+        self.reverse_resource_type_mappings = _RESOURCE_TF_TO_CF
+
+        # Intrinsic function tables bind methods, so they're built on first use
+        self._cf_to_tf_functions: Optional[Dict[str, Any]] = None
+        self._tf_to_cf_functions: Optional[Dict[str, Any]] = None
+        self._tf_func_items: Tuple[Tuple[str, Any], ...] = ()
+
+    @property
+    def cf_to_tf_functions(self) -> Dict[str, Any]:
+        """Function mappings for CloudFormation intrinsic functions"""
+        if self._cf_to_tf_functions is None:
+            self._cf_to_tf_functions = {
+                "Fn::Join": self._convert_join,
+                "Fn::Sub": self._convert_sub,
+                "Ref": self._convert_ref,
+                "Fn::GetAtt": self._convert_get_att,
+                "Fn::Select": self._convert_select,
+                "Condition": self._convert_condition
+            }
+        return self._cf_to_tf_functions
+
+    @property
+    def tf_to_cf_functions(self) -> Dict[str, Any]:
+        """Function mappings for Terraform expressions"""
+        if self._tf_to_cf_functions is None:
+            self._tf_to_cf_functions = {
+                "join": self._convert_to_cf_join,
+                "format": self._convert_to_cf_sub,
+                "aws_region": {"Ref": "AWS::Region"},
+                "aws_account_id": {"Ref": "AWS::AccountId"}
+            }
+        return self._tf_to_cf_functions
 
     def tf_to_cf(self, tf_content: str) -> Dict[str, Any]:
         """Convert Terraform HCL to CloudFormation template"""
+        return self._tf_to_cf(_parse_hcl, tf_content)
+
+    def tf_to_cf_file(self, path: Union[str, "os.PathLike[str]"]) -> Dict[str, Any]:
+        """Convert a Terraform file to CloudFormation template
+
+        The file is memory-mapped and hashed in place for the parse cache,
+        so it is only read into a string when it hasn't been parsed before.
+        """
+        return self._tf_to_cf(_parse_hcl_file, path)
+
+    def _tf_to_cf(self, parse: Callable[[Any], Any], source: Any) -> Dict[str, Any]:
+        """Parse Terraform source with parse and convert it to CloudFormation"""
         try:
             # Parse HCL content
-            tf_dict = hcl2.loads(tf_content)
+            tf_dict = parse(source)
             
             # Initialize CloudFormation template structure
             cf_template = {
@@ -93,47 +854,52 @@ class CloudFormatConverter:
                 "Outputs": {}
             }
             
-            # Convert variables to parameters
-            if "variable" in tf_dict:
-                cf_template["Parameters"].update(
-                    self._convert_variables_to_parameters(tf_dict["variable"])
-                )
-            
-            # Convert resources
-            if "resource" in tf_dict:
-                cf_template["Resources"].update(
-                    self._convert_tf_resources_to_cf(tf_dict["resource"])
-                )
-            
-            # Convert outputs
-            if "output" in tf_dict:
-                cf_template["Outputs"].update(
-                    self._convert_tf_outputs_to_cf(tf_dict["output"])
-                )
-            
-            # Convert provider configurations
-            if "provider" in tf_dict:
-                self._handle_provider_config(tf_dict["provider"], cf_template)
+            # Convert every top-level section in a single pass over the parsed file
+            handlers = {
+                "variable": self._handle_tf_variables,
+                "resource": self._handle_tf_resources,
+                "output": self._handle_tf_outputs,
+                "provider": self._handle_provider_config,
+            }
+            for section, blocks in tf_dict.items():
+                handler = handlers.get(section)
+                if handler is not None:
+                    labels = 2 if section == "resource" else 1
+                    handler(_merge_hcl_blocks(blocks, labels), cf_template)
             
             # Remove empty sections
-            cf_template = {k: v for k, v in cf_template.items() if v}
+            for section in list(cf_template):
+                if not cf_template[section]:
+                    del cf_template[section]
             
             return cf_template
         
         except Exception as e:
             raise Exception(f"Error converting Terraform to CloudFormation: {str(e)}")
 
+    def render_yaml(self, template: Dict[str, Any]) -> str:
+        """Render a CloudFormation template returned by tf_to_cf as YAML"""
+        return _emit_cf_yaml(template)
+
     def cf_to_tf(self, cf_content: Union[str, Dict]) -> str:
         """Convert CloudFormation template to Terraform HCL"""
+        return "".join(self.cf_to_tf_chunks(cf_content))
+
+    def cf_to_tf_chunks(self, cf_content: Union[str, Dict, IO[str]]) -> Iterator[str]:
+        """Convert CloudFormation template to Terraform HCL, one top-level block at a time
+
+        Accepts template text, an already parsed dict or an open file. The
+        blocks are rendered lazily, so writing them out as they are produced
+        never holds the whole configuration as a single string.
+        """
         try:
-            # Parse CloudFormation template if it's a string
+            # Parse CloudFormation template if it's a string or file
             if isinstance(cf_content, str):
-                if cf_content.startswith('{'):
-                    cf_dict = json.loads(cf_content)
-                else:
-                    cf_dict = yaml.safe_load(cf_content)
-            else:
+                cf_dict = _parse_yaml(cf_content)
+            elif isinstance(cf_content, dict):
                 cf_dict = cf_content
+            else:
+                cf_dict = _parse_cf_file(cf_content)
             
             # Initialize Terraform configuration
             tf_config = {
@@ -157,20 +923,45 @@ class CloudFormatConverter:
             tf_config["resource"] = self._convert_cf_resources_to_tf(cf_dict.get("Resources", {}))
             
             # Remove empty sections
-            tf_config = {k: v for k, v in tf_config.items() if v}
-            
-            return self._format_tf_output(tf_config)
+            for section in list(tf_config):
+                if not tf_config[section]:
+                    del tf_config[section]
         
         except Exception as e:
             raise Exception(f"Error converting CloudFormation to Terraform: {str(e)}")
 
+        return self._iter_tf_output(tf_config)
+
+    def cf_to_tf_stream(self, cf_file: IO[str]) -> str:
+        """Convert CloudFormation template read from an open file to Terraform HCL"""
+        return "".join(self.cf_to_tf_chunks(cf_file))
+
+    def _handle_tf_variables(self, variables: Dict, cf_template: Dict) -> None:
+        """Convert Terraform variables to CloudFormation parameters"""
+        cf_template["Parameters"].update(self._convert_variables_to_parameters(variables))
+
+    def _handle_tf_resources(self, resources: Dict, cf_template: Dict) -> None:
+        """Convert Terraform resources"""
+        cf_template["Resources"].update(self._convert_tf_resources_to_cf(resources))
+
+    def _handle_tf_outputs(self, outputs: Dict, cf_template: Dict) -> None:
+        """Convert Terraform outputs"""
+        cf_template["Outputs"].update(self._convert_tf_outputs_to_cf(outputs))
+
     def _convert_variables_to_parameters(self, variables: Dict) -> Dict:
         """Convert Terraform variables to CloudFormation parameters"""
-        parameters = {}
-        
+        return dict(self._iter_parameters(variables))
+
+    def _iter_parameters(self, variables: Dict) -> Iterator[Tuple[str, Dict]]:
+        """Yield (name, parameter) pairs for Terraform variables"""
         for var_name, var_config in variables.items():
+            # hcl2 returns type expressions as interpolations, e.g. "${list(string)}"
+            tf_type = var_config.get("type", "string")
+            if tf_type.startswith("${") and tf_type.endswith("}"):
+                tf_type = tf_type[2:-1]
+            
             parameter = {
-                "Type": self._get_cf_parameter_type(var_config.get("type", "string")),
+                "Type": self._get_cf_parameter_type(tf_type.split("(", 1)[0]),
                 "Description": var_config.get("description", f"Parameter for {var_name}")
             }
             
@@ -184,9 +975,7 @@ class CloudFormatConverter:
                 if "allowed_values" in var_config["validation"]:
                     parameter["AllowedValues"] = var_config["validation"]["allowed_values"]
             
-            parameters[var_name] = parameter
-        
-        return parameters
+            yield var_name, parameter
 
     def _convert_parameters_to_variables(self, parameters: Dict) -> Dict:
         """Convert CloudFormation parameters to Terraform variables"""
@@ -203,7 +992,7 @@ class CloudFormatConverter:
             
             if "AllowedValues" in param_config:
                 variable["validation"] = {
-                    "condition": f"can(index([{', '.join(map(repr, param_config['AllowedValues']))}], var.{param_name}))",
+                    "condition": f"can(index([{', '.join(map(json.dumps, param_config['AllowedValues']))}], var.{param_name}))",
                     "error_message": f"Variable {param_name} must be one of: {', '.join(map(str, param_config['AllowedValues']))}"
                 }
             
@@ -213,49 +1002,62 @@ class CloudFormatConverter:
 
     def _convert_tf_resources_to_cf(self, resources: Dict) -> Dict:
         """Convert Terraform resources to CloudFormation resources"""
-        cf_resources = {}
+        return dict(self._iter_cf_resources(resources))
+
+    def _iter_cf_resources(self, resources: Dict) -> Iterator[Tuple[str, Dict]]:
+        """Yield (logical ID, resource) pairs for Terraform resources"""
+        reverse_get = self.reverse_resource_type_mappings.get
+        convert_value = self._convert_tf_value_to_cf
         
         for resource_type, type_resources in resources.items():
+            cf_resource_type = reverse_get(resource_type)
+            if cf_resource_type is None:
+                cf_resource_type = _fallback_cf_type(resource_type)
+            handler = _RESOURCE_HANDLERS.get(resource_type, _handle_generic)
+            
             for resource_name, resource_config in type_resources.items():
-                cf_resource_type = self.reverse_resource_type_mappings.get(
-                    resource_type,
-                    f"AWS::{resource_type.split('_')[1].title()}::{resource_type.split('_')[2].title()}"
-                )
-                
                 # Handle dependencies
                 depends_on = resource_config.pop("depends_on", [])
                 
                 # Convert the resource configuration
-                cf_resources[resource_name] = {
+                cf_resource = {
                     "Type": cf_resource_type,
-                    "Properties": self._convert_tf_properties_to_cf(resource_config)
+                    "Properties": convert_value(handler(resource_config))
                 }
                 
-                # Add DependsOn if needed
+                # Add DependsOn if needed; CloudFormation takes a single
+                # logical ID as a bare string
                 if depends_on:
-                    cf_resources[resource_name]["DependsOn"] = depends_on
+                    deps = [_tf_reference_name(dep) for dep in depends_on]
+                    cf_resource["DependsOn"] = deps[0] if len(deps) == 1 else deps
+                
+                yield resource_name, cf_resource
+
+    def _convert_cf_properties_to_tf(self, properties: Dict) -> Dict:
+        """Convert CloudFormation resource properties to Terraform arguments"""
+        arguments = self._convert_cf_value_to_tf(_convert_cf_block_to_tf(properties))
         
-        return cf_resources
+        # Terraform takes IAM policy documents as JSON strings
+        policy = arguments.get("assume_role_policy")
+        if isinstance(policy, dict):
+            arguments["assume_role_policy"] = json.dumps(policy)
+        
+        return arguments
 
     def _convert_cf_resources_to_tf(self, resources: Dict) -> Dict:
         """Convert CloudFormation resources to Terraform resources"""
-        tf_resources = {}
+        tf_resources: DefaultDict[str, Dict[str, Any]] = defaultdict(dict)
+        mappings_get = self.resource_type_mappings.get
+        convert_props = self._convert_cf_properties_to_tf
         
         for resource_name, resource_data in resources.items():
             cf_type = resource_data["Type"]
-            tf_type = self.resource_type_mappings.get(
-                cf_type,
-                f"aws_{cf_type.split('::')[1].lower()}_{cf_type.split('::')[2].lower()}"
-            )
-            
-            # Initialize resource type if not exists
-            if tf_type not in tf_resources:
-                tf_resources[tf_type] = {}
+            tf_type = mappings_get(cf_type)
+            if tf_type is None:
+                tf_type = _fallback_tf_type(cf_type)
             
             # Convert properties
-            resource_config = self._convert_cf_properties_to_tf(
-                resource_data.get("Properties", {})
-            )
+            resource_config = convert_props(resource_data.get("Properties", {}))
             
             # Handle dependencies
             if "DependsOn" in resource_data:
@@ -267,7 +1069,7 @@ class CloudFormatConverter:
             
             tf_resources[tf_type][resource_name] = resource_config
         
-        return tf_resources
+        return dict(tf_resources)
 
     def _convert_tf_outputs_to_cf(self, outputs: Dict) -> Dict:
         """Convert Terraform outputs to CloudFormation outputs"""
@@ -306,7 +1108,7 @@ class CloudFormatConverter:
     def _convert_join(self, params: List) -> str:
         """Convert Fn::Join to Terraform format"""
         delimiter, items = params
-        return f"${{join('{delimiter}', {json.dumps(items)})}}"
+        return f"${{join('{delimiter}', {_dumps_str_list(items)})}}"
 
     def _convert_sub(self, params: Union[str, List]) -> str:
         """Convert Fn::Sub to Terraform format"""
@@ -340,7 +1142,7 @@ class CloudFormatConverter:
     def _convert_select(self, params: List) -> str:
         """Convert Fn::Select to Terraform format"""
         index, array = params
-        return f"${{element({json.dumps(array)}, {index})}}"
+        return f"${{element({_dumps_str_list(array)}, {index})}}"
 
     def _convert_condition(self, condition_name: str) -> str:
         """Convert Condition to Terraform format"""
@@ -349,45 +1151,25 @@ class CloudFormatConverter:
     def _convert_to_cf_join(self, tf_expression: str) -> Dict:
         """Convert Terraform join to Fn::Join"""
         # Extract delimiter and items from join("delimiter", [...])
-        match = re.match(r'join\("([^"]+)",\s*\[(.*)\]\)', tf_expression)
-        if match:
-            delimiter, items = match.groups()
-            return {"Fn::Join": [delimiter, json.loads(f"[{items}]")]}
+        parsed = _parse_tf_join(tf_expression)
+        if parsed:
+            delimiter, items = parsed
+            return {"Fn::Join": [delimiter, items]}
         return tf_expression
 
     def _convert_to_cf_sub(self, tf_expression: str) -> Dict:
         """Convert Terraform string interpolation to Fn::Sub"""
         # Convert ${var.name} to ${Name} format
-        template = re.sub(r'\$\{var\.([^}]+)\}', r'${{\1}}', tf_expression)
+        template = _SUB_VAR_RE.sub(r'${{\1}}', tf_expression)
         return {"Fn::Sub": template}
 
     def _get_cf_parameter_type(self, tf_type: str) -> str:
         """Map Terraform variable types to CloudFormation parameter types"""
-        type_mapping = {
-            "string": "String",
-            "number": "Number",
-            "bool": "String",
-            "list": "CommaDelimitedList",
-            # Complex types
-            "map": "String",
-            "object": "String",
-            "set": "CommaDelimitedList"
-        }
-        return type_mapping.get(tf_type, "String")
+        return _CF_PARAM_TYPE_MAP.get(tf_type, "String")
 
     def _get_tf_variable_type(self, cf_type: str) -> str:
         """Map CloudFormation parameter types to Terraform variable types"""
-        type_mapping = {
-            "String": "string",
-            "Number": "number",
-            "CommaDelimitedList": "list(string)",
-            "List<Number>": "list(number)",
-            "AWS::EC2::KeyPair::KeyName": "string",
-            "AWS::EC2::SecurityGroup::Id": "string",
-            "AWS::EC2::Subnet::Id": "string",
-            "AWS::EC2::VPC::Id": "string"
-        }
-        return type_mapping.get(cf_type, "string")
+        return _TF_VAR_TYPE_MAP.get(cf_type, "string")
 
     def _handle_provider_config(self, provider_config: Dict, cf_template: Dict) -> None:
         """Handle Terraform provider configuration"""
@@ -403,7 +1185,7 @@ class CloudFormatConverter:
             
             # Handle assumed role
             if "assume_role" in aws_config:
-                role_arn = aws_config["assume_role"].get("role_arn")
+                role_arn = _merge_hcl_blocks(aws_config["assume_role"], 0).get("role_arn")
                 if role_arn:
                     cf_template["Parameters"]["AssumeRoleArn"] = {
                         "Type": "String",
@@ -429,45 +1211,43 @@ class CloudFormatConverter:
 
     def _convert_simple_sub(self, template: str) -> str:
         """Convert simple Fn::Sub to Terraform format"""
-        # Replace ${XXX} with ${var.XXX} for parameters
-        return re.sub(r'\$\{([^}]+)\}', r'${var.\1}', template)
+        return convert_simple_sub(template)
 
     def _convert_complex_sub(self, template: str, mapping: Dict) -> str:
         """Convert complex Fn::Sub to Terraform format"""
-        result = template
-        for key, value in mapping.items():
-            if isinstance(value, dict):
-                # Handle intrinsic functions in mapping
-                value = self._convert_cf_value_to_tf(value)
-            result = result.replace(f"${{{key}}}", str(value))
-        return result
+        return convert_complex_sub(template, mapping, self._convert_cf_value_to_tf)
 
     def _convert_cf_value_to_tf(self, value: Any) -> Any:
         """Convert CloudFormation value to Terraform format"""
-        if isinstance(value, dict):
-            if len(value) == 1:
-                fn_name, params = next(iter(value.items()))
-                if fn_name in self.cf_to_tf_functions:
-                    return self.cf_to_tf_functions[fn_name](params)
-            return {k: self._convert_cf_value_to_tf(v) for k, v in value.items()}
-        elif isinstance(value, list):
-            return [self._convert_cf_value_to_tf(item) for item in value]
-        return value
+        return convert_cf_value_to_tf(value, self.cf_to_tf_functions)
 
     def _convert_tf_value_to_cf(self, value: Any) -> Any:
         """Convert Terraform value to CloudFormation format"""
-        if isinstance(value, str):
-            # Handle string interpolation
-            if "${" in value:
-                for tf_func, cf_func in self.tf_to_cf_functions.items():
-                    if tf_func in value:
-                        return cf_func(value)
-            return value
-        elif isinstance(value, dict):
-            return {k: self._convert_tf_value_to_cf(v) for k, v in value.items()}
-        elif isinstance(value, list):
-            return [self._convert_tf_value_to_cf(item) for item in value]
-        return value
+        if not self._tf_func_items:
+            self._tf_func_items = tuple(self.tf_to_cf_functions.items())
+        return convert_tf_value_to_cf(value, self._tf_func_items)
+
+    def _iter_tf_output(self, tf_config: Dict[str, Any]) -> Iterator[str]:
+        """Render a Terraform configuration as HCL, yielding one top-level block at a time"""
+        first = True
+        for header, body, resource_body in self._iter_tf_blocks(tf_config):
+            yield ("" if first else "\n") + _format_hcl_block(header, body, resource_body)
+            first = False
+
+    def _iter_tf_blocks(self, tf_config: Dict[str, Any]) -> Iterator[Tuple[str, Dict, bool]]:
+        """Yield (header, body, is_resource) for each top-level block of the configuration"""
+        if "terraform" in tf_config:
+            yield "terraform", tf_config["terraform"], False
+        for provider_name, provider_config in tf_config.get("provider", {}).items():
+            yield f"provider {json.dumps(provider_name)}", provider_config, False
+        for var_name, var_config in tf_config.get("variable", {}).items():
+            yield f"variable {json.dumps(var_name)}", var_config, False
+        for tf_type, type_resources in tf_config.get("resource", {}).items():
+            for resource_name, resource_config in type_resources.items():
+                header = f"resource {json.dumps(tf_type)} {json.dumps(resource_name)}"
+                yield header, resource_config, True
+        for output_name, output_config in tf_config.get("output", {}).items():
+            yield f"output {json.dumps(output_name)}", output_config, False
 
     def _format_dependencies(self, resource_name: str, depends_on: List[str]) -> str:
         """Format resource dependencies"""
@@ -482,10 +1262,10 @@ class CloudFormatConverter:
         try:
             if target.lower() == "cloudformation":
                 # Validate CloudFormation template
-                json.loads(source) if source.startswith("{") else yaml.safe_load(source)
+                _parse_yaml(source)
             else:
                 # Validate Terraform HCL
-                hcl2.loads(source)
+                _parse_hcl(source)
             return True
         except Exception as e:
             raise ValueError(f"Validation failed: {str(e)}")
@@ -0,0 +1,45 @@
+import pytest
+from cloud_format_converter.converter import _PARSE_MEMO
+
+# S3 bucket templates shared by the converter and CLI tests
+S3_TF = """\
+resource "aws_s3_bucket" "example" {
+  bucket = "my-test-bucket"
+  tags = {
+    Environment = "dev"
+  }
+}
+"""
+
+S3_CF = """\
+Resources:
+  MyBucket:
+    Type: AWS::S3::Bucket
+    Properties:
+      BucketName: my-test-bucket
+      Tags:
+        - Key: Environment
+          Value: dev
+"""
+
+
+@pytest.fixture(autouse=True)
+def parse_cache_dir(tmp_path_factory, monkeypatch):
+    """Give every test its own on-disk parse cache outside the user's home directory
+
+    The in-process memo is cleared too, so every test starts from the disk.
+    """
+    cache_home = tmp_path_factory.mktemp("cache")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(cache_home))
+    _PARSE_MEMO.clear()
+    return cache_home / "cloud-format-converter"
+
+
+@pytest.fixture(scope="session")
+def s3_tf():
+    return S3_TF
+
+
+@pytest.fixture(scope="session")
+def s3_cf():
+    return S3_CF
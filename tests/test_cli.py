@@ -1,64 +1,105 @@
+"""CLI tests
+
+Fixtures are stateless or write to unique pytest temporary directories, so
+the module can run in parallel with pytest-xdist: pytest -n auto
+"""
 import pytest
 from cloud_format_converter.cli import CloudFormatCLI
-import tempfile
-import os
+import io
+import mmap
+import sys
+from dataclasses import dataclass
+from typing import Optional
+
+@dataclass(frozen=True)
+class Args:
+    input: str
+    output: str
+    format: str
+    output_format: Optional[str]
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def cli():
     return CloudFormatCLI()
 
-@pytest.fixture
-def temp_tf_file():
-    content = """
-    resource "aws_s3_bucket" "example" {
-      bucket = "my-test-bucket"
-    }
-    """
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.tf', delete=False) as f:
-        f.write(content)
-        return f.name
-
-@pytest.fixture
-def temp_cf_file():
-    content = """
-    Resources:
-      MyBucket:
-        Type: AWS::S3::Bucket
-        Properties:
-          BucketName: my-test-bucket
-    """
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-        f.write(content)
-        return f.name
+@pytest.fixture(scope="session")
+def temp_tf_file(tmp_path_factory, s3_tf):
+    path = tmp_path_factory.mktemp("fixtures") / "input.tf"
+    path.write_bytes(s3_tf.encode())
+    return str(path)
+
+@pytest.fixture(scope="session")
+def temp_cf_file(tmp_path_factory, s3_cf):
+    path = tmp_path_factory.mktemp("fixtures") / "input.yaml"
+    path.write_bytes(s3_cf.encode())
+    return str(path)
 
 def test_convert_tf_to_cf(cli, temp_tf_file, tmp_path):
-    output_file = os.path.join(tmp_path, "output.yaml")
-    args = type('Args', (), {
-        'input': temp_tf_file,
-        'output': output_file,
-        'format': 'cf',
-        'output_format': 'yaml'
-    })()
+    output_file = tmp_path / "output.yaml"
+    args = Args(input=temp_tf_file, output=str(output_file), format='cf', output_format='yaml')
     
     cli.convert(args)
-    assert os.path.exists(output_file)
+    assert output_file.exists()
     
-    with open(output_file, 'r') as f:
-        content = f.read()
-        assert 'AWS::S3::Bucket' in content
+    with open(output_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        assert mm.find(b'AWS::S3::Bucket') != -1
 
 def test_convert_cf_to_tf(cli, temp_cf_file, tmp_path):
-    output_file = os.path.join(tmp_path, "output.tf")
-    args = type('Args', (), {
-        'input': temp_cf_file,
-        'output': output_file,
-        'format': 'tf',
-        'output_format': None
-    })()
+    output_file = tmp_path / "output.tf"
+    args = Args(input=temp_cf_file, output=str(output_file), format='tf', output_format=None)
     
     cli.convert(args)
-    assert os.path.exists(output_file)
+    assert output_file.exists()
     
-    with open(output_file, 'r') as f:
-        content = f.read()
-        assert 'aws_s3_bucket' in content
\ No newline at end of file
+    with open(output_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        assert mm.find(b'aws_s3_bucket') != -1
+
+def test_write_chunks_to_stdout_descriptor(cli, capfd):
+    cli.write_output("-", iter(["a\n", "b\n"]))
+    assert capfd.readouterr().out == "a\nb\n\n"
+
+class _CountingBuffer(io.BytesIO):
+    flushes = 0
+
+    def flush(self):
+        self.flushes += 1
+        super().flush()
+
+class _NoFilenoStdout:
+    def __init__(self):
+        self.buffer = _CountingBuffer()
+
+    def fileno(self):
+        raise io.UnsupportedOperation("fileno")
+
+    def flush(self):
+        pass
+
+def test_write_chunks_to_stdout_buffer_flushes_once(cli, monkeypatch):
+    stdout = _NoFilenoStdout()
+    monkeypatch.setattr(sys, "stdout", stdout)
+
+    cli.write_output("-", iter(["a\n", "b\n", "c\n"]))
+    assert stdout.buffer.getvalue() == b"a\nb\nc\n\n"
+    assert stdout.buffer.flushes == 1
+
+@pytest.mark.parametrize("argv", [
+    ["convert", "input.tf", "output.yaml"],
+    ["convert", "-", "-", "--format", "cf", "--output-format=json"],
+    ["convert", "--format=tf", "template.yaml", "output.tf"],
+    ["validate", "template.yaml", "--type", "cloudformation"],
+])
+def test_fast_parse_matches_argparse(cli, argv):
+    assert cli._fast_parse(argv) == cli.setup_parser().parse_args(argv)
+
+@pytest.mark.parametrize("argv", [
+    [],
+    ["--help"],
+    ["convert", "input.tf", "--help"],
+    ["convert", "input.tf"],
+    ["convert", "input.tf", "output.yaml", "--format", "xml"],
+    ["convert", "input.tf", "output.yaml", "--form", "cf"],
+    ["validate", "template.yaml"],
+])
+def test_fast_parse_defers_to_argparse(cli, argv):
+    assert cli._fast_parse(argv) is None
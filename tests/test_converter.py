@@ -1,43 +1,75 @@
+import io
+import json
+import os
+
 import pytest
-from cloud_format_converter.converter import CloudFormatConverter
+import yaml
+from cloud_format_converter import converter as converter_module
+from cloud_format_converter.converter import (
+    CloudFormatConverter,
+    _camel_to_snake,
+    _cf_yaml_loader,
+    _dumps_str_list,
+    _parse_cf,
+    _parse_tf_join,
+)
 
-def test_tf_to_cf_basic_s3():
-    converter = CloudFormatConverter()
-    tf_content = """
-    resource "aws_s3_bucket" "example" {
-      bucket = "my-test-bucket"
-      tags = {
-        Environment = "dev"
-      }
-    }
-    """
-    
-    result = converter.tf_to_cf(tf_content)
+
+@pytest.fixture(scope="session")
+def converter():
+    return CloudFormatConverter()
+
+
+def test_tf_to_cf_basic_s3(converter, s3_tf):
+    result = converter.tf_to_cf(s3_tf)
     
     assert "Resources" in result
     assert "example" in result["Resources"]
     assert result["Resources"]["example"]["Type"] == "AWS::S3::Bucket"
     assert result["Resources"]["example"]["Properties"]["BucketName"] == "my-test-bucket"
 
-def test_cf_to_tf_basic_s3():
-    converter = CloudFormatConverter()
-    cf_content = """
-    Resources:
-      MyBucket:
-        Type: AWS::S3::Bucket
-        Properties:
-          BucketName: my-test-bucket
-          Tags:
-            - Key: Environment
-              Value: dev
-    """
-    
-    result = converter.cf_to_tf(cf_content)
+
+def test_cf_to_tf_basic_s3(converter, s3_cf):
+    result = converter.cf_to_tf(s3_cf)
     assert 'resource "aws_s3_bucket" "MyBucket"' in result
-    assert '"bucket" = "my-test-bucket"' in result
+    assert 'bucket = "my-test-bucket"' in result
+    assert 'tags = {\n    "Environment" = "dev"' in result
+    assert converter.validate_conversion(result, "terraform")
+
 
-def test_variable_conversion():
-    converter = CloudFormatConverter()
+@pytest.mark.parametrize("cf_name,tf_name", [
+    ("MemorySize", "memory_size"),
+    ("VpcId", "vpc_id"),
+    ("VPCId", "vpc_id"),
+    ("S3Bucket", "s3_bucket"),
+    ("SSEAlgorithm", "sse_algorithm"),
+])
+def test_camel_to_snake(cf_name, tf_name):
+    assert _camel_to_snake(cf_name) == tf_name
+
+
+def test_cf_properties_to_tf(converter):
+    policy = {
+        "Version": "2012-10-17",
+        "Statement": [{"Effect": "Allow", "Action": "sts:AssumeRole"}],
+    }
+    arguments = converter._convert_cf_properties_to_tf({
+        "RoleName": "lambda-role",
+        "AssumeRolePolicyDocument": policy,
+        "Environment": {"Variables": {"LOG_LEVEL": "debug", "TableName": "locks"}},
+        "VPCConfig": {"SubnetIds": ["subnet-1"]},
+    })
+
+    # Overrides from _CF_TO_TF_PROP win over the snake_case name
+    assert arguments["name"] == "lambda-role"
+    # Policy documents are serialized to JSON with their keys as written
+    assert json.loads(arguments["assume_role_policy"]) == policy
+    # Map keys are user data and are not renamed, property types are
+    assert arguments["environment"] == {"variables": {"LOG_LEVEL": "debug", "TableName": "locks"}}
+    assert arguments["vpc_config"] == {"subnet_ids": ["subnet-1"]}
+
+
+def test_variable_conversion(converter):
     tf_content = """
     variable "environment" {
       type        = string
@@ -52,8 +84,21 @@ def test_variable_conversion():
     assert result["Parameters"]["environment"]["Type"] == "String"
     assert result["Parameters"]["environment"]["Default"] == "dev"
 
-def test_complex_resource_conversion():
-    converter = CloudFormatConverter()
+
+def test_allowed_values_condition_is_valid_hcl(converter):
+    cf_content = """
+    Parameters:
+      Environment:
+        Type: String
+        AllowedValues: [dev, prod]
+    """
+
+    result = converter.cf_to_tf(cf_content)
+    assert 'can(index(["dev", "prod"], var.Environment))' in result
+    assert converter.validate_conversion(result, "terraform")
+
+
+def test_complex_resource_conversion(converter):
     tf_content = """
     resource "aws_lambda_function" "example" {
       filename         = "lambda.zip"
@@ -76,4 +121,288 @@ def test_complex_resource_conversion():
     assert "Resources" in result
     assert "example" in result["Resources"]
     assert result["Resources"]["example"]["Type"] == "AWS::Lambda::Function"
-    assert "DependsOn" in result["Resources"]["example"]
\ No newline at end of file
+    assert result["Resources"]["example"]["DependsOn"] == "lambda_policy"
+
+
+def test_lambda_code_location_grouped(converter):
+    tf_content = """
+    resource "aws_lambda_function" "example" {
+      function_name = "example_lambda"
+      s3_bucket     = "code-bucket"
+      s3_key        = "lambda.zip"
+    }
+    """
+
+    properties = converter.tf_to_cf(tf_content)["Resources"]["example"]["Properties"]
+    assert properties == {
+        "FunctionName": "example_lambda",
+        "Code": {"S3Bucket": "code-bucket", "S3Key": "lambda.zip"},
+    }
+
+
+def test_iam_role_policy_conversion(converter):
+    tf_content = r'''
+    resource "aws_iam_role" "parsed" {
+      name               = "parsed-role"
+      assume_role_policy = <<EOT
+    {"Version": "2012-10-17", "Statement": []}
+    EOT
+    }
+
+    resource "aws_iam_role" "escaped" {
+      assume_role_policy = "{\"Version\": \"2012-10-17\"}"
+    }
+
+    resource "aws_iam_role" "interpolated" {
+      assume_role_policy = <<EOT
+    {"Version": ${var.policy_version}}
+    EOT
+    }
+    '''
+
+    resources = converter.tf_to_cf(tf_content)["Resources"]
+    parsed = resources["parsed"]["Properties"]
+    assert parsed["RoleName"] == "parsed-role"
+    assert parsed["AssumeRolePolicyDocument"] == {"Version": "2012-10-17", "Statement": []}
+    # Policies that aren't plain JSON are passed through as strings
+    assert isinstance(resources["escaped"]["Properties"]["AssumeRolePolicyDocument"], str)
+    assert isinstance(resources["interpolated"]["Properties"]["AssumeRolePolicyDocument"], str)
+
+
+def test_cf_short_form_intrinsics(converter):
+    cf_content = """
+    Resources:
+      MyBucket:
+        Type: AWS::S3::Bucket
+        Properties:
+          BucketName: !Sub "${AWS::StackName}-bucket"
+          Tags:
+            - Key: Arn
+              Value: !GetAtt MyRole.Arn
+            - Key: Name
+              Value: !Join ["-", [!Ref Prefix, "data"]]
+    """
+
+    result = yaml.load(cf_content, Loader=_cf_yaml_loader())
+    properties = result["Resources"]["MyBucket"]["Properties"]
+    assert properties["BucketName"] == {"Fn::Sub": "${AWS::StackName}-bucket"}
+    assert properties["Tags"][0]["Value"] == {"Fn::GetAtt": ["MyRole", "Arn"]}
+    assert properties["Tags"][1]["Value"] == {"Fn::Join": ["-", [{"Ref": "Prefix"}, "data"]]}
+    assert converter.validate_conversion(cf_content, "cloudformation")
+
+
+@pytest.mark.parametrize("items", [
+    [],
+    ["a", "b c", "d-e"],
+    ['say "hi"', "back\\slash", '\\"', "/"],
+    ["café", "日本", "emoji \U0001F600"],
+    ["tab\t", "new\nline", "nul\x00", "del\x7f", "bell\x07"],
+    ["a", 1, 2.5, True, None, ["b"], {"c": "d"}],
+    ("tuple", "items"),
+    "not a list",
+])
+def test_dumps_str_list_matches_json(items):
+    assert _dumps_str_list(items) == json.dumps(items)
+
+
+@pytest.mark.parametrize("expr,expected", [
+    ('join("-", ["a", "b"])', ("-", ["a", "b"])),
+    ('join(", ", [ "a", 1, ["nested]"]])', (", ", ["a", 1, ["nested]"]])),
+    ('join("", ["a", "b"])', ("", ["a", "b"])),
+    ('join("-", [])', ("-", [])),
+    # Not a join call, or not only one
+    ('format("%s", "a")', None),
+    ('${join("-", ["a"])}', None),
+    ('join("-", ["a"]) + "b"', None),
+    # Malformed calls
+    ('join("-" ["a"])', None),
+    ('join("-", "a")', None),
+    ('join("-", ["a"]', None),
+    ('join("-", ["a", "b")', None),
+    # References aren't JSON literals and are left as written
+    ('join("-", [var.x, "b"])', None),
+])
+def test_parse_tf_join(expr, expected):
+    assert _parse_tf_join(expr) == expected
+
+
+def test_complex_sub_substitutes_in_one_pass(converter):
+    sub = {"Fn::Sub": [
+        "${Name}-${Env}-${Env}-${AWS::Region}",
+        {"Name": "app-${Env}", "Env": {"Ref": "Stage"}},
+    ]}
+
+    # Every placeholder is replaced, including repeats and intrinsic values,
+    # and substituted text is not rewritten again by later keys
+    assert converter._convert_cf_value_to_tf(sub) == (
+        "app-${Env}-${var.Stage}-${var.Stage}-${AWS::Region}"
+    )
+
+
+def test_parse_cache_reuses_results(converter, tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    cf_content = "Resources:\n  MyBucket:\n    Type: AWS::S3::Bucket\n"
+
+    assert converter.validate_conversion(cf_content, "cloudformation")
+    cache_files = list((tmp_path / "cloud-format-converter").glob("cf-*.pkl"))
+    assert len(cache_files) == 1
+
+    # A hit on disk must not parse again
+    def fail_parse(content, kind):
+        raise AssertionError("parsed despite a cached result")
+
+    converter_module._PARSE_MEMO.clear()
+    with monkeypatch.context() as patch:
+        patch.setattr(converter_module, "_parse", fail_parse)
+        assert converter.validate_conversion(cf_content, "cloudformation")
+    assert list((tmp_path / "cloud-format-converter").glob("cf-*.pkl")) == cache_files
+
+    # An unreadable entry is a miss rather than an error
+    cache_files[0].write_bytes(b"\x80\x05not a pickle")
+    converter_module._PARSE_MEMO.clear()
+    assert converter.validate_conversion(cf_content, "cloudformation")
+
+
+def test_parse_cache_evicts_least_recently_used(parse_cache_dir, monkeypatch):
+    monkeypatch.setattr(converter_module, "_PARSE_CACHE_MAX_ENTRIES", 2)
+    templates = [f"Resources:\n  Bucket{n}:\n    Type: AWS::S3::Bucket\n" for n in range(3)]
+
+    converter_module._parse_yaml(templates[0])
+    converter_module._parse_yaml(templates[1])
+    # Future access times are never updated by reads, as on a noatime mount
+    for age, entry in enumerate(sorted(parse_cache_dir.glob("cf-*.pkl"), key=os.path.getmtime)):
+        os.utime(entry, (3_000_000_000 + age, 1000 + age))
+    oldest = min(parse_cache_dir.glob("cf-*.pkl"), key=os.path.getmtime)
+    newest = max(parse_cache_dir.glob("cf-*.pkl"), key=os.path.getmtime)
+
+    # Reading the older entry from disk makes it the most recently used
+    converter_module._PARSE_MEMO.clear()
+    converter_module._parse_yaml(templates[0])
+    converter_module._parse_yaml(templates[2])
+
+    remaining = set(parse_cache_dir.glob("cf-*.pkl"))
+    assert len(remaining) == 2
+    assert oldest in remaining and newest not in remaining
+
+
+def test_parse_cache_removes_partial_entries(s3_cf, parse_cache_dir, monkeypatch):
+    def fail_replace(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(converter_module.os, "replace", fail_replace)
+    assert converter_module._parse_yaml(s3_cf)["Resources"]
+    assert list(parse_cache_dir.iterdir()) == []
+
+
+def test_parse_cache_can_be_disabled(s3_cf, parse_cache_dir, monkeypatch):
+    monkeypatch.setenv("CLOUD_FORMAT_CONVERTER_NO_CACHE", "1")
+    assert converter_module._parse_yaml(s3_cf)["Resources"]
+    assert not parse_cache_dir.exists() or not list(parse_cache_dir.iterdir())
+
+
+def test_parse_memo_keeps_digests_of_small_templates(s3_cf, monkeypatch):
+    first = converter_module._parse_yaml(s3_cf)
+    first["Resources"].clear()
+    # Callers get their own copy, and the memo holds a digest rather than the text
+    assert converter_module._parse_yaml(s3_cf)["Resources"]
+    assert [len(key) for key in converter_module._PARSE_MEMO] == [len("cf-") + 64]
+
+    converter_module._PARSE_MEMO.clear()
+    monkeypatch.setattr(converter_module, "_PARSE_MEMO_MAX_CONTENT", len(s3_cf) - 1)
+    converter_module._parse_yaml(s3_cf)
+    assert not converter_module._PARSE_MEMO
+
+
+def test_tf_to_cf_file_shares_parse_cache(converter, s3_tf, tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    tf_file = tmp_path / "main.tf"
+    tf_file.write_bytes(s3_tf.encode())
+
+    assert converter.tf_to_cf_file(tf_file) == converter.tf_to_cf(s3_tf)
+    assert len(list((tmp_path / "cache" / "cloud-format-converter").glob("tf-*.pkl"))) == 1
+
+    empty_file = tmp_path / "empty.tf"
+    empty_file.write_bytes(b"")
+    assert converter.tf_to_cf_file(empty_file) == converter.tf_to_cf("")
+
+
+def test_tf_to_cf_file_accepts_crlf(converter, s3_tf, tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    lf_file = tmp_path / "lf.tf"
+    lf_file.write_bytes(s3_tf.encode())
+    crlf_file = tmp_path / "crlf.tf"
+    crlf_file.write_bytes(s3_tf.replace("\n", "\r\n").encode())
+
+    assert converter.tf_to_cf_file(crlf_file) == converter.tf_to_cf(s3_tf)
+    # Line endings are translated before hashing, so both files share one entry
+    assert converter.tf_to_cf_file(lf_file) == converter.tf_to_cf(s3_tf)
+    assert len(list((tmp_path / "cache" / "cloud-format-converter").glob("tf-*.pkl"))) == 1
+
+
+def test_parse_cf_detects_json_and_flow_yaml():
+    json_content = '\n  {"Resources": {"MyBucket": {"Type": "AWS::S3::Bucket"}}}'
+    yaml_content = "{Resources: {MyBucket: {Type: AWS::S3::Bucket}}}"
+
+    expected = {"Resources": {"MyBucket": {"Type": "AWS::S3::Bucket"}}}
+    assert _parse_cf(json_content) == expected
+    assert _parse_cf(yaml_content) == expected
+
+
+def test_render_yaml_round_trips(converter):
+    template = {
+        "AWSTemplateFormatVersion": "2010-09-09",
+        "Parameters": {
+            "Env": {"Type": "String", "AllowedValues": ["yes", "no", "1", ""], "Default": "dev"}
+        },
+        "Resources": {
+            "MyBucket": {
+                "Type": "AWS::S3::Bucket",
+                "Properties": {
+                    "BucketName": {"Fn::Sub": "${AWS::StackName}-bucket"},
+                    "Tags": [{"Key": "Name", "Value": "a: b #c"}, []],
+                    "Versioned": True,
+                    "Retention": 30,
+                    "Notes": "café",
+                },
+            }
+        },
+        "Outputs": {},
+    }
+
+    output = converter.render_yaml(template)
+    assert "Type: AWS::S3::Bucket" in output
+    assert yaml.safe_load(output) == template
+
+    # Exponent floats need a dotted mantissa to load back as floats
+    limits = {"Limits": [1e20, 1e-7, -2.5e-10, 0.5, 3]}
+    assert yaml.safe_load(converter.render_yaml(limits)) == limits
+
+
+def test_cf_file_input_matches_text(converter, tmp_path):
+    cf_content = '{"Resources": {"Queue": {"Type": "AWS::SQS::Queue", "Properties": {"DelaySeconds": 1e1}}}}'
+    cf_file = tmp_path / "template.json"
+    cf_file.write_text(cf_content)
+
+    # JSON templates read from files are parsed as JSON, not YAML 1.1
+    with open(cf_file) as f:
+        assert converter.cf_to_tf_stream(f) == converter.cf_to_tf(cf_content)
+
+
+class _ChunkedOnly(io.StringIO):
+    """A file that refuses to be read whole"""
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            raise OSError("read whole")
+        return super().read(size)
+
+
+def test_cf_file_input_streams_yaml(converter, s3_cf):
+    # YAML is loaded from the handle in chunks, never read into one string
+    assert converter.cf_to_tf_stream(_ChunkedOnly(s3_cf)) == converter.cf_to_tf(s3_cf)
+
+    flow_yaml = "{Resources: {MyBucket: {Type: AWS::S3::Bucket}}}"
+    with pytest.raises(Exception, match="read whole"):
+        # Brace-first templates are read whole to try JSON first
+        converter.cf_to_tf_stream(_ChunkedOnly(flow_yaml))
+    assert converter.cf_to_tf_stream(io.StringIO(flow_yaml)) == converter.cf_to_tf(flow_yaml)